@@ -4,20 +4,15 @@ from __future__ import annotations
 
 import argparse
 import logging
+import os
 import sys
 import tempfile
+import zipfile
 from dataclasses import dataclass
 from pathlib import Path
 import shutil
 from typing import Optional
 
-from b3dm_to_glb import convert_manifest_tiles
-from dae_qc import log_qc, qc_dae
-from blender_export import export_collada
-from kml_writer import write_kml
-from kmz_packager import package_kmz
-from tileset_manifest import build_manifest
-
 
 class ExitCodes:
     SUCCESS = 0
@@ -26,12 +21,16 @@ class ExitCodes:
     PACKAGING_FAILURE = 4
 
 
+_MIN_SHM_FREE_BYTES = 512 * 1024 * 1024
+
+
 @dataclass(frozen=True)
 class AppPaths:
     input_dir: Path
     tileset_path: Path
     output_path: Path
     cache_dir: Path
+    temp_root: Optional[Path] = None
     temp_dir: Optional[Path] = None
 
 
@@ -42,6 +41,17 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     )
     parser.add_argument("--input", required=True, help="Tileset input directory")
     parser.add_argument("--output", required=True, help="Output .kmz file path")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Max parallel b3dm -> glb conversions (default: CPU count)",
+    )
+    parser.add_argument(
+        "--tmpdir",
+        default=None,
+        help="Directory for per-run temp files (default: /dev/shm if 512 MiB free, $TMPDIR, then cache dir)",
+    )
     return parser.parse_args(argv)
 
 
@@ -59,15 +69,39 @@ def resolve_paths(args: argparse.Namespace) -> AppPaths:
 
     output_path = Path(args.output).expanduser().resolve()
     cache_dir = input_dir / ".tiles_to_kmz_cache"
+    if args.tmpdir:
+        temp_root = Path(args.tmpdir).expanduser().resolve()
+    else:
+        temp_root = _default_temp_root(cache_dir)
 
     return AppPaths(
         input_dir=input_dir,
         tileset_path=tileset_path,
         output_path=output_path,
         cache_dir=cache_dir,
+        temp_root=temp_root,
     )
 
 
+def _default_temp_root(cache_dir: Path) -> Path:
+    # Run manifests grow with tile count (about 1 KB per tile), and /dev/shm is RAM that is
+    # often capped (64 MiB in Docker), so it is only used when it has real headroom.
+    shm_dir = Path("/dev/shm")
+    if shm_dir.is_dir() and os.access(shm_dir, os.W_OK) and _free_bytes(shm_dir) >= _MIN_SHM_FREE_BYTES:
+        return shm_dir
+    env_tmp = os.environ.get("TMPDIR")
+    if env_tmp and Path(env_tmp).is_dir() and os.access(env_tmp, os.W_OK):
+        return Path(env_tmp)
+    return cache_dir
+
+
+def _free_bytes(path: Path) -> int:
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return 0
+
+
 def validate_args(args: argparse.Namespace, paths: AppPaths) -> None:
     if not paths.input_dir.exists() or not paths.input_dir.is_dir():
         raise ValueError(f"Input directory not found: {paths.input_dir}")
@@ -78,17 +112,30 @@ def validate_args(args: argparse.Namespace, paths: AppPaths) -> None:
     if paths.output_path.suffix.lower() != ".kmz":
         raise ValueError("Output file must have a .kmz extension")
 
+    if args.jobs is not None and args.jobs < 1:
+        raise ValueError("--jobs must be a positive integer")
+
+    if args.tmpdir and (paths.temp_root is None or not paths.temp_root.is_dir()):
+        raise ValueError(f"Temp directory not found: {args.tmpdir}")
+    if args.tmpdir and not os.access(paths.temp_root, os.W_OK):
+        raise ValueError(f"Temp directory is not writable: {args.tmpdir}")
+
     output_parent = paths.output_path.parent
     output_parent.mkdir(parents=True, exist_ok=True)
 
 def create_workspace(paths: AppPaths) -> AppPaths:
     paths.cache_dir.mkdir(parents=True, exist_ok=True)
-    temp_dir = Path(tempfile.mkdtemp(prefix="run_", dir=str(paths.cache_dir)))
+    temp_root = paths.temp_root or paths.cache_dir
+    try:
+        temp_dir = Path(tempfile.mkdtemp(prefix="run_", dir=str(temp_root)))
+    except OSError as exc:
+        raise ValueError(f"Cannot create temp directory in {temp_root}: {exc}") from exc
     return AppPaths(
         input_dir=paths.input_dir,
         tileset_path=paths.tileset_path,
         output_path=paths.output_path,
         cache_dir=paths.cache_dir,
+        temp_root=temp_root,
         temp_dir=temp_dir,
     )
 
@@ -121,14 +168,12 @@ def log_blender_summary(output_path: Path, tile_count: int) -> None:
 
 
 def log_kml_summary(
-    kml_path: Path,
     latitude: float,
     longitude: float,
     altitude: float,
     origin_strategy: str,
 ) -> None:
     logging.info("Phase 5 georeferencing + KML complete.")
-    logging.info("KML output: %s", kml_path)
     logging.info("Origin (lat, lon, alt): %.6f, %.6f, %.2f", latitude, longitude, altitude)
     logging.info("Origin strategy: %s", origin_strategy)
 
@@ -152,6 +197,23 @@ def main(argv: list[str] | None = None) -> int:
         return ExitCodes.INVALID_INPUT
 
     log_scaffold_summary(paths)
+    try:
+        return run_pipeline(args, paths)
+    finally:
+        # Failed runs must not leave temp files behind, especially when they live in RAM.
+        if paths.temp_dir is not None:
+            shutil.rmtree(paths.temp_dir, ignore_errors=True)
+
+
+def run_pipeline(args: argparse.Namespace, paths: AppPaths) -> int:
+    # Pipeline modules pull in numpy; import them only once the arguments are valid.
+    from b3dm_to_glb import convert_manifest_tiles
+    from dae_qc import log_qc, qc_dae
+    from blender_export import export_collada
+    from kml_writer import build_kml
+    from kmz_packager import package_kmz
+    from tileset_manifest import build_manifest
+
     try:
         manifest_result = build_manifest(
             tileset_path=paths.tileset_path,
@@ -165,7 +227,11 @@ def main(argv: list[str] | None = None) -> int:
     log_manifest_summary(manifest_result.tile_count, manifest_result.manifest_path)
 
     try:
-        summary = convert_manifest_tiles(manifest_result.manifest, paths.cache_dir)
+        summary = convert_manifest_tiles(
+            manifest_result.tiles,
+            paths.cache_dir,
+            jobs=args.jobs,
+        )
     except ValueError as exc:
         logging.error("%s", exc)
         return ExitCodes.INVALID_INPUT
@@ -178,6 +244,7 @@ def main(argv: list[str] | None = None) -> int:
     try:
         export_result = export_collada(
             manifest_result.manifest,
+            manifest_result.tiles,
             paths.cache_dir,
             paths.temp_dir or paths.cache_dir,
         )
@@ -197,10 +264,8 @@ def main(argv: list[str] | None = None) -> int:
         logging.warning("DAE QC failed: %s", exc)
 
     try:
-        kml_path = export_result.output_path.parent / "doc.kml"
-        kml_result = write_kml(
+        kml_result = build_kml(
             manifest_result.manifest,
-            kml_path,
             model_href="model.dae",
         )
     except ValueError as exc:
@@ -208,7 +273,6 @@ def main(argv: list[str] | None = None) -> int:
         return ExitCodes.INVALID_INPUT
 
     log_kml_summary(
-        kml_result.output_path,
         kml_result.latitude,
         kml_result.longitude,
         kml_result.altitude,
@@ -218,18 +282,14 @@ def main(argv: list[str] | None = None) -> int:
     try:
         package_result = package_kmz(
             paths.output_path,
-            kml_result.output_path,
+            kml_result.content,
             export_result.output_path,
         )
-    except (FileNotFoundError, ValueError, RuntimeError) as exc:
+    except (FileNotFoundError, ValueError, RuntimeError, zipfile.LargeZipFile) as exc:
         logging.error("KMZ packaging failed: %s", exc)
         return ExitCodes.PACKAGING_FAILURE
 
     log_packaging_summary(package_result.output_path, package_result.input_count)
-
-    if paths.temp_dir is not None:
-        shutil.rmtree(paths.temp_dir)
-
     return ExitCodes.SUCCESS
 
 
@@ -1,12 +1,27 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
+import mmap
+import os
+import struct
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from tile_types import TileRecord
+
+_WORKER_SCRIPT = Path(__file__).resolve().parent / "tools" / "b3dm_worker.mjs"
+_WORKER_UNAVAILABLE = 2
+# Other stdout lines (e.g. 3d-tiles-tools logging) are not part of the worker protocol.
+_WORKER_RESULT_TAG = "@@b3dm_worker "
+# magic, version, byteLength, then feature/batch table JSON and binary lengths.
+_B3DM_HEADER = struct.Struct("<4sIIIIII")
+_GLB_HEADER = struct.Struct("<4sII")
+
 
 @dataclass(frozen=True)
 class ConversionSummary:
@@ -14,59 +29,216 @@ class ConversionSummary:
     skipped: int
 
 
-def convert_manifest_tiles(manifest: dict[str, Any], cache_dir: Path) -> ConversionSummary:
-    tiles = manifest.get("tiles")
-    if not isinstance(tiles, list) or not tiles:
+def convert_manifest_tiles(
+    tiles: list[TileRecord],
+    cache_dir: Path,
+    jobs: int | None = None,
+) -> ConversionSummary:
+    if not tiles:
         raise ValueError("Manifest contains no tiles to convert")
 
     hash_dir = cache_dir / "hashes"
     hash_dir.mkdir(parents=True, exist_ok=True)
 
-    converted = 0
-    skipped = 0
-
+    entries: list[tuple[Path, Path, Path, os.stat_result]] = []
     for tile in tiles:
-        tile_id = _require_str(tile, "tile_id")
-        b3dm_path = Path(_require_str(tile, "b3dm_path"))
-        glb_path = Path(_require_str(tile, "glb_path"))
-        hash_path = hash_dir / f"{tile_id}.sha256"
+        try:
+            b3dm_stat = tile.b3dm_path.stat()
+        except FileNotFoundError:
+            raise ValueError(f"Missing b3dm content: {tile.b3dm_path}") from None
+        entries.append((tile.b3dm_path, tile.glb_path, hash_dir / f"{tile.tile_id}.json", b3dm_stat))
+
+    pending, skipped = _split_cached(entries, jobs)
+    if pending:
+        # Tiles are unpacked in-process; only ones that need upgrading hit a Node worker.
+        batches = _split_batches(pending, jobs)
+        worker_count = len(batches)
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            list(executor.map(_convert_batch, batches))
 
-        if not b3dm_path.exists():
-            raise ValueError(f"Missing b3dm content: {b3dm_path}")
+    return ConversionSummary(converted=len(pending), skipped=skipped)
 
-        current_hash = _hash_file(b3dm_path)
-        if _is_cache_valid(glb_path, hash_path, current_hash):
+
+def _split_cached(
+    entries: list[tuple[Path, Path, Path, os.stat_result]],
+    jobs: int | None,
+) -> tuple[list[tuple[Path, Path, Path, str]], int]:
+    skipped = 0
+    # Tiles whose size and mtime match the cache record are treated as unchanged without hashing.
+    to_hash: list[tuple[Path, Path, Path, os.stat_result, dict[str, Any] | None]] = []
+    for b3dm_path, glb_path, hash_path, b3dm_stat in entries:
+        record = _read_cache_record(hash_path) if glb_path.exists() else None
+        if record is not None and _stat_matches(record, b3dm_stat):
             skipped += 1
             continue
+        to_hash.append((b3dm_path, glb_path, hash_path, b3dm_stat, record))
+
+    hashes: list[str] = []
+    if to_hash:
+        # hashlib releases the GIL, so hashing scales across threads.
+        with ThreadPoolExecutor(max_workers=_worker_count(jobs, len(to_hash))) as executor:
+            hashes = list(executor.map(_hash_file, [entry[0] for entry in to_hash]))
 
+    pending: list[tuple[Path, Path, Path, str]] = []
+    for (b3dm_path, glb_path, hash_path, b3dm_stat, record), current_hash in zip(to_hash, hashes):
+        cache_record = _format_cache_record(current_hash, b3dm_stat)
+        if record is not None and record.get("sha256") == current_hash:
+            # Content is unchanged (e.g. touched or old-format record); refresh the quick-check fields.
+            hash_path.write_text(cache_record, encoding="utf-8")
+            skipped += 1
+            continue
         glb_path.parent.mkdir(parents=True, exist_ok=True)
-        _run_b3dm_to_glb(b3dm_path, glb_path)
-        hash_path.write_text(current_hash, encoding="utf-8")
-        converted += 1
+        pending.append((b3dm_path, glb_path, hash_path, cache_record))
+
+    return pending, skipped
+
+
+def _worker_count(jobs: int | None, item_count: int) -> int:
+    limit = jobs if jobs is not None else (os.cpu_count() or 1)
+    return max(1, min(limit, item_count))
+
+
+def _split_batches(
+    pending: list[tuple[Path, Path, Path, str]],
+    jobs: int | None,
+) -> list[list[tuple[Path, Path, Path, str]]]:
+    # A tile with several b3dm contents yields jobs sharing one glb and cache record;
+    # those stay in one batch so they run in manifest order instead of racing.
+    groups: dict[Path, list[tuple[Path, Path, Path, str]]] = {}
+    for job in pending:
+        groups.setdefault(job[1], []).append(job)
+    worker_count = _worker_count(jobs, len(groups))
+    batches: list[list[tuple[Path, Path, Path, str]]] = [[] for _ in range(worker_count)]
+    for index, group in enumerate(groups.values()):
+        batches[index % worker_count].extend(group)
+    return batches
+
+
+def _convert_batch(batch: list[tuple[Path, Path, Path, str]]) -> None:
+    remaining: list[tuple[Path, Path, Path, str]] = []
+    for job in batch:
+        b3dm_path, glb_path, _, _ = job
+        glb = _extract_glb(b3dm_path.read_bytes())
+        if glb is None:
+            remaining.append(job)
+            continue
+        glb_path.write_bytes(glb)
+        _mark_converted(job)
+    if remaining:
+        _run_worker(remaining)
+
 
-    return ConversionSummary(converted=converted, skipped=skipped)
+def _mark_converted(job: tuple[Path, Path, Path, str]) -> None:
+    # Cache record is written only after a successful conversion so failures are retried next run.
+    _, _, hash_path, cache_record = job
+    hash_path.write_text(cache_record, encoding="utf-8")
 
 
-def _require_str(payload: dict[str, Any], key: str) -> str:
-    value = payload.get(key)
-    if not isinstance(value, str):
-        raise ValueError(f"Manifest tile missing '{key}'")
-    return value
+def _extract_glb(data: bytes) -> memoryview | None:
+    """Return the embedded glTF 2.0 payload, or None when the tile needs 3d-tiles-tools."""
+    if len(data) < _B3DM_HEADER.size:
+        return None
+    magic, version, _, *table_lengths = _B3DM_HEADER.unpack_from(data)
+    if magic != b"b3dm" or version != 1:
+        return None
+    # Legacy headers or glTF 1.0 payloads miss this check and go through the upgrade path.
+    start = _B3DM_HEADER.size + sum(table_lengths)
+    if start + _GLB_HEADER.size > len(data):
+        return None
+    glb_magic, glb_version, glb_length = _GLB_HEADER.unpack_from(data, start)
+    if glb_magic != b"glTF" or glb_version != 2 or start + glb_length > len(data):
+        return None
+    return memoryview(data)[start : start + glb_length]
+
+
+def _run_worker(batch: list[tuple[Path, Path, Path, str]]) -> None:
+    requests = "".join(
+        json.dumps({"id": index, "input": str(b3dm_path), "output": str(glb_path)}) + "\n"
+        for index, (b3dm_path, glb_path, _, _) in enumerate(batch)
+    )
+    logging.info("Converting %d tiles in one b3dm worker", len(batch))
+    result = subprocess.run(
+        ["node", str(_WORKER_SCRIPT)],
+        input=requests,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode == _WORKER_UNAVAILABLE:
+        reason = (result.stderr.strip().splitlines() or ["unknown reason"])[0]
+        logging.warning("b3dm worker unavailable, using npx per tile: %s", reason)
+        for job in batch:
+            _run_b3dm_to_glb(job[0], job[1])
+            _mark_converted(job)
+        return
+
+    errors: dict[int, str] = {}
+    completed: set[int] = set()
+    for line in result.stdout.splitlines():
+        if not line.startswith(_WORKER_RESULT_TAG):
+            continue
+        index, response = _parse_worker_result(line[len(_WORKER_RESULT_TAG) :], len(batch))
+        if response.get("ok"):
+            completed.add(index)
+            _mark_converted(batch[index])
+        else:
+            errors[index] = str(response.get("error") or "Unknown failure")
+
+    if errors:
+        index, message = next(iter(errors.items()))
+        raise RuntimeError(f"b3dmToGlb failed for {batch[index][0].name}: {message}")
+    if len(completed) != len(batch):
+        message = result.stderr.strip() or "Worker exited before finishing all tiles"
+        raise RuntimeError(f"b3dm worker failed ({result.returncode}): {message}")
+
+
+def _parse_worker_result(payload: str, batch_size: int) -> tuple[int, dict[str, Any]]:
+    try:
+        response = json.loads(payload)
+        index = int(response["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise RuntimeError(f"b3dm worker sent a malformed result: {payload[:200]!r}") from exc
+    if not 0 <= index < batch_size:
+        raise RuntimeError(f"b3dm worker sent a result for unknown job {index}")
+    return index, response
 
 
 def _hash_file(path: Path) -> str:
     digest = hashlib.sha256()
     with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
+        # mmap cannot map empty files; their digest is the empty-input hash.
+        if os.fstat(handle.fileno()).st_size > 0:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
     return digest.hexdigest()
 
 
-def _is_cache_valid(glb_path: Path, hash_path: Path, current_hash: str) -> bool:
-    if not glb_path.exists() or not hash_path.exists():
-        return False
-    cached_hash = hash_path.read_text(encoding="utf-8").strip()
-    return cached_hash == current_hash
+def _read_cache_record(hash_path: Path) -> dict[str, Any] | None:
+    if not hash_path.exists():
+        # Older caches stored only the hex digest in <tile_id>.sha256.
+        legacy_path = hash_path.with_suffix(".sha256")
+        if not legacy_path.exists():
+            return None
+        return {"sha256": legacy_path.read_text(encoding="utf-8").strip()}
+    try:
+        record = json.loads(hash_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _format_cache_record(current_hash: str, b3dm_stat: os.stat_result) -> str:
+    return json.dumps(
+        {
+            "sha256": current_hash,
+            "size": b3dm_stat.st_size,
+            "mtime_ns": b3dm_stat.st_mtime_ns,
+        }
+    )
+
+
+def _stat_matches(record: dict[str, Any], b3dm_stat: os.stat_result) -> bool:
+    return record.get("size") == b3dm_stat.st_size and record.get("mtime_ns") == b3dm_stat.st_mtime_ns
 
 
 def _run_b3dm_to_glb(b3dm_path: Path, glb_path: Path) -> None:
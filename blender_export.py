@@ -1,16 +1,18 @@
 from __future__ import annotations
 
-import json
 import logging
 import math
 import subprocess
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import numpy as np
 
 from geo import ecef_to_lla_radians
+from json_io import dumps_json
+from tile_types import TileRecord, column_major_to_matrices, matrices_to_column_major
 
 
 @dataclass(frozen=True)
@@ -22,11 +24,11 @@ class ExportResult:
 
 def export_collada(
     manifest: dict[str, Any],
+    tiles: list[TileRecord],
     cache_dir: Path,
     temp_dir: Path,
 ) -> ExportResult:
-    tiles = manifest.get("tiles")
-    if not isinstance(tiles, list) or not tiles:
+    if not tiles:
         raise ValueError("Manifest contains no tiles to export")
 
     origin = manifest.get("origin")
@@ -42,12 +44,11 @@ def export_collada(
 
     local_tiles = _build_local_tiles(tiles, origin_ecef)
     export_manifest = {"tiles": local_tiles}
-    export_manifest_path.write_text(
-        json.dumps(export_manifest, indent=2),
-        encoding="utf-8",
-    )
+    export_manifest_path.write_bytes(dumps_json(export_manifest))
 
     output_path = export_dir / "model.dae"
+    # Drop stale QC stats so a failed export cannot be reported with old numbers.
+    output_path.with_suffix(".qc.json").unlink(missing_ok=True)
     _run_blender(export_manifest_path, output_path)
 
     if not output_path.exists():
@@ -60,48 +61,30 @@ def export_collada(
     )
 
 
-def _build_local_tiles(tiles: list[dict[str, Any]], origin_ecef: list[float]) -> list[dict[str, Any]]:
-    origin_vec = np.array(origin_ecef, dtype=float)
-    ecef_to_enu = _ecef_to_enu_matrix(origin_vec)
-    local_tiles: list[dict[str, Any]] = []
+def _build_local_tiles(tiles: list[TileRecord], origin_ecef: list[float]) -> list[dict[str, Any]]:
+    origin = (float(origin_ecef[0]), float(origin_ecef[1]), float(origin_ecef[2]))
+    ecef_to_enu = _ecef_to_enu_matrix(origin)
 
     for tile in tiles:
-        glb_path = Path(_require_str(tile, "glb_path"))
-        transform_ecef = tile.get("transform_ecef")
-        if not isinstance(transform_ecef, list) or len(transform_ecef) != 16:
-            raise ValueError("Manifest tile missing transform_ecef")
-        if not glb_path.exists():
-            raise ValueError(f"Missing glb file: {glb_path}")
-
-        tile_matrix = _matrix_from_column_major(transform_ecef)
-        local_matrix = ecef_to_enu @ tile_matrix
-        local_tiles.append(
-            {
-                "tile_id": _require_str(tile, "tile_id"),
-                "glb_path": str(glb_path),
-                "transform_enu": _matrix_to_column_major(local_matrix),
-            }
-        )
-
-    return local_tiles
-
-
-def _require_str(payload: dict[str, Any], key: str) -> str:
-    value = payload.get(key)
-    if not isinstance(value, str):
-        raise ValueError(f"Manifest tile missing '{key}'")
-    return value
-
-
-def _matrix_from_column_major(values: list[float]) -> np.ndarray:
-    return np.array(values, dtype=float).reshape((4, 4), order="F")
-
-
-def _matrix_to_column_major(matrix: np.ndarray) -> list[float]:
-    return [float(value) for value in matrix.reshape(16, order="F")]
+        if not tile.glb_path.exists():
+            raise ValueError(f"Missing glb file: {tile.glb_path}")
+
+    tile_matrices = column_major_to_matrices([tile.transform_ecef for tile in tiles])
+    local_transforms = matrices_to_column_major(ecef_to_enu @ tile_matrices).tolist()
+
+    return [
+        {
+            "tile_id": tile.tile_id,
+            "glb_path": str(tile.glb_path),
+            "transform_enu": transform_enu,
+        }
+        for tile, transform_enu in zip(tiles, local_transforms)
+    ]
 
 
-def _ecef_to_enu_matrix(origin_ecef: np.ndarray) -> np.ndarray:
+@lru_cache(maxsize=16)
+def _ecef_to_enu_matrix(origin: tuple[float, float, float]) -> np.ndarray:
+    origin_ecef = np.array(origin, dtype=float)
     lat, lon, _ = ecef_to_lla_radians(origin_ecef)
     sin_lat = math.sin(lat)
     cos_lat = math.cos(lat)
@@ -121,6 +104,8 @@ def _ecef_to_enu_matrix(origin_ecef: np.ndarray) -> np.ndarray:
     matrix = np.identity(4, dtype=float)
     matrix[:3, :3] = rotation
     matrix[:3, 3] = translation
+    # Cached and shared between calls, so callers must not modify it.
+    matrix.flags.writeable = False
     return matrix
 
 
@@ -4,7 +4,13 @@ import sys
 from pathlib import Path
 
 import bpy
-from mathutils import Matrix, Vector
+import numpy as np
+from mathutils import Matrix
+
+try:
+    import orjson
+except ImportError:  # Blender's bundled Python rarely ships orjson
+    orjson = None
 
 
 def main() -> None:
@@ -17,7 +23,7 @@ def main() -> None:
     if not manifest_path.exists():
         raise RuntimeError(f"Manifest not found: {manifest_path}")
 
-    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest = _load_manifest(manifest_path)
     tiles = manifest.get("tiles")
     if not isinstance(tiles, list) or not tiles:
         raise RuntimeError("Manifest contains no tiles")
@@ -45,11 +51,14 @@ def main() -> None:
             "Collada exporter not available in this Blender build. "
             "Install Blender 3.6/4.x with the io_scene_dae addon."
         )
+    qc_stats = _collect_qc_stats()
     bpy.ops.wm.collada_export(
         filepath=str(output_path),
         check_existing=False,
         apply_modifiers=True,
     )
+    qc_stats["size_bytes"] = output_path.stat().st_size
+    output_path.with_suffix(".qc.json").write_text(json.dumps(qc_stats), encoding="utf-8")
 
 
 def _parse_args() -> dict[str, str]:
@@ -73,6 +82,13 @@ def _parse_args() -> dict[str, str]:
     return args
 
 
+def _load_manifest(path: Path) -> dict:
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def _clear_scene() -> None:
     bpy.ops.object.select_all(action="SELECT")
     bpy.ops.object.delete()
@@ -108,17 +124,63 @@ def _apply_grounding_offset() -> None:
 
 def _scene_min_z() -> float | None:
     depsgraph = bpy.context.evaluated_depsgraph_get()
-    min_z = None
+    matrices = []
+    corners = []
+    for obj in bpy.context.scene.objects:
+        if obj.type != "MESH":
+            continue
+        eval_obj = obj.evaluated_get(depsgraph)
+        matrices.append(np.array(eval_obj.matrix_world, dtype=float))
+        corners.append(np.array([tuple(corner) for corner in eval_obj.bound_box], dtype=float))
+    if not matrices:
+        return None
+    # Only world Z is needed: third matrix row applied to every (N, 8) local corner at once.
+    z_rows = np.stack(matrices)[:, 2, :]
+    world_z = np.einsum("nj,nkj->nk", z_rows[:, :3], np.stack(corners)) + z_rows[:, 3:]
+    return float(world_z.min())
+
+
+def _collect_qc_stats() -> dict:
+    # Mirrors what dae_qc._scan_dae counts in the written file. With apply_modifiers the
+    # exporter writes one <geometry> per mesh object, holding its evaluated vertices in
+    # object-local space, and one <node> per object plus one per armature bone.
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    geometry_count = 0
+    node_count = 0
+    triangles_count = 0
+    positions_count = 0
+    bbox_min = None
+    bbox_max = None
     for obj in bpy.context.scene.objects:
+        node_count += 1
+        if obj.type == "ARMATURE":
+            node_count += len(obj.data.bones)
         if obj.type != "MESH":
             continue
+        geometry_count += 1
         eval_obj = obj.evaluated_get(depsgraph)
-        for corner in eval_obj.bound_box:
-            world_corner = eval_obj.matrix_world @ Vector(corner)
-            z = world_corner.z
-            if min_z is None or z < min_z:
-                min_z = z
-    return min_z
+        mesh = eval_obj.to_mesh()
+        mesh.calc_loop_triangles()
+        triangles_count += len(mesh.loop_triangles)
+        vertex_count = len(mesh.vertices)
+        if vertex_count:
+            coords = np.empty(vertex_count * 3, dtype=float)
+            mesh.vertices.foreach_get("co", coords)
+            local = coords.reshape(-1, 3)
+            mesh_min = local.min(axis=0)
+            mesh_max = local.max(axis=0)
+            bbox_min = mesh_min if bbox_min is None else np.minimum(bbox_min, mesh_min)
+            bbox_max = mesh_max if bbox_max is None else np.maximum(bbox_max, mesh_max)
+            positions_count += vertex_count
+        eval_obj.to_mesh_clear()
+    return {
+        "geometry_count": geometry_count,
+        "node_count": node_count,
+        "triangles_count": triangles_count,
+        "bbox_min": None if bbox_min is None else bbox_min.tolist(),
+        "bbox_max": None if bbox_max is None else bbox_max.tolist(),
+        "positions_count": positions_count,
+    }
 
 
 def _ensure_collada_exporter() -> None:
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+
+from geo import ecef_to_lla_degrees, lla_degrees_to_ecef
+from tile_types import column_major_to_matrices
+
+
+def derive_origin(
+    root_tile: dict[str, Any],
+    root_full: np.ndarray,
+) -> tuple[list[float], list[float], str]:
+    bounding_volume = root_tile.get("boundingVolume")
+    if isinstance(bounding_volume, dict):
+        region = _region(bounding_volume)
+        if region is not None:
+            origin_lla = _region_center_lla(region)
+            return list(lla_degrees_to_ecef(origin_lla)), origin_lla, "region"
+        local_center = _local_center(bounding_volume)
+        if local_center is not None:
+            strategy, center = local_center
+            return _transformed_origin(root_full, center, strategy)
+
+    origin_ecef = _extract_translation(root_full)
+    origin_lla = list(ecef_to_lla_degrees(origin_ecef))
+    return origin_ecef, origin_lla, "root"
+
+
+def tile_centers_ecef(
+    bounding_volumes: list[Any],
+    transforms_ecef: np.ndarray,
+) -> list[list[float] | None]:
+    # Box/sphere centers are tile-local, so all of them go through one batched transform.
+    # Regions are already geographic and are converted directly.
+    count = len(bounding_volumes)
+    centers: list[list[float] | None] = [None] * count
+    # Local centers are packed at the front of one homogeneous buffer, in local_indices order.
+    local_centers = np.empty((count, 4), dtype=np.float64)
+    local_centers[:, 3] = 1.0
+    local_indices: list[int] = []
+    for index, bounding_volume in enumerate(bounding_volumes):
+        if not isinstance(bounding_volume, dict):
+            continue
+        region = _region(bounding_volume)
+        if region is not None:
+            centers[index] = list(lla_degrees_to_ecef(_region_center_lla(region)))
+            continue
+        local_center = _local_center(bounding_volume)
+        if local_center is not None:
+            local_centers[len(local_indices), :3] = local_center[1]
+            local_indices.append(index)
+
+    if local_indices:
+        matrices = column_major_to_matrices(transforms_ecef[local_indices])
+        packed = local_centers[: len(local_indices)]
+        ecef = np.einsum("nij,nj->ni", matrices, packed)[:, :3].tolist()
+        for index, center_ecef in zip(local_indices, ecef):
+            centers[index] = center_ecef
+    return centers
+
+
+def _region(bounding_volume: dict[str, Any]) -> list[Any] | None:
+    region = bounding_volume.get("region")
+    if isinstance(region, list) and len(region) == 6:
+        return region
+    return None
+
+
+def _region_center_lla(region: list[Any]) -> list[float]:
+    west, south, east, north, min_h, _ = np.asarray(region, dtype=np.float64).tolist()
+    return [math.degrees((south + north) * 0.5), math.degrees((west + east) * 0.5), min_h]
+
+
+def _local_center(bounding_volume: dict[str, Any]) -> tuple[str, list[Any]] | None:
+    # Returns the volume kind ("sphere" or "box") with its tile-local center values.
+    sphere = bounding_volume.get("sphere")
+    if isinstance(sphere, list) and len(sphere) == 4:
+        return "sphere", sphere[:3]
+    box = bounding_volume.get("box")
+    if isinstance(box, list) and len(box) == 12:
+        return "box", box[:3]
+    return None
+
+
+def _transformed_origin(
+    root_full: np.ndarray,
+    values: list[Any],
+    strategy: str,
+) -> tuple[list[float], list[float], str]:
+    center = np.empty(4, dtype=np.float64)
+    center[:3] = values
+    center[3] = 1.0
+    origin_ecef = (root_full @ center)[:3].tolist()
+    origin_lla = list(ecef_to_lla_degrees(origin_ecef))
+    return origin_ecef, origin_lla, strategy
+
+
+def _extract_translation(matrix: np.ndarray) -> list[float]:
+    return [matrix[0, 3].item(), matrix[1, 3].item(), matrix[2, 3].item()]
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import json
 import logging
+import warnings
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterator
 import xml.etree.ElementTree as ET
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class DaeQcResult:
@@ -23,31 +27,105 @@ def qc_dae(dae_path: Path) -> DaeQcResult:
         raise FileNotFoundError(f"DAE not found: {dae_path}")
 
     size_bytes = dae_path.stat().st_size
-    tree = ET.parse(dae_path)
-    root = tree.getroot()
+    sidecar_result = _read_qc_sidecar(dae_path.with_suffix(".qc.json"), size_bytes)
+    if sidecar_result is not None:
+        return sidecar_result
+    return _scan_dae(dae_path, size_bytes)
+
+
+def _read_qc_sidecar(sidecar_path: Path, size_bytes: int) -> DaeQcResult | None:
+    # Stats written by blender_exporter.py, counted the same way _scan_dae counts the file
+    # (bbox in position-array space); a size mismatch means they describe another export.
+    if not sidecar_path.exists():
+        return None
+    try:
+        stats = json.loads(sidecar_path.read_text(encoding="utf-8"))
+        if stats.get("size_bytes") != size_bytes:
+            return None
+        return DaeQcResult(
+            size_bytes=size_bytes,
+            geometry_count=int(stats["geometry_count"]),
+            node_count=int(stats["node_count"]),
+            triangles_count=int(stats["triangles_count"]),
+            bbox_min=_optional_point(stats.get("bbox_min")),
+            bbox_max=_optional_point(stats.get("bbox_max")),
+            positions_count=int(stats["positions_count"]),
+        )
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError):
+        return None
+
 
-    namespace = _detect_namespace(root.tag)
-    ns = {"c": namespace} if namespace else {}
+def _optional_point(values: list[float] | None) -> tuple[float, float, float] | None:
+    if values is None:
+        return None
+    return float(values[0]), float(values[1]), float(values[2])
 
-    geometry_count = len(root.findall(".//c:library_geometries/c:geometry", ns))
-    node_count = len(root.findall(".//c:library_visual_scenes//c:node", ns))
 
+def _scan_dae(dae_path: Path, size_bytes: int) -> DaeQcResult:
+    geometry_count = 0
+    node_count = 0
     triangles_count = 0
-    for tri in root.findall(".//c:triangles", ns):
-        count_attr = tri.get("count")
-        if count_attr and count_attr.isdigit():
-            triangles_count += int(count_attr)
+    bbox = _BboxAccumulator()
+    # Position arrays wait here until their accessor (which follows them) gives the stride.
+    pending_positions: dict[str, np.ndarray] = {}
+    open_elements: list[ET.Element] = []
+    open_names: list[str] = []
+    visual_scenes_depth = 0
+    # Tags repeat heavily, so strip each namespace prefix only once.
+    local_names: dict[str, str] = {}
+
+    for event, elem in ET.iterparse(dae_path, events=("start", "end")):
+        name = local_names.get(elem.tag)
+        if name is None:
+            name = local_names[elem.tag] = _local_name(elem.tag)
+        if event == "start":
+            if name == "geometry" and open_names and open_names[-1] == "library_geometries":
+                geometry_count += 1
+            elif name == "node" and visual_scenes_depth:
+                node_count += 1
+            elif name == "library_visual_scenes":
+                visual_scenes_depth += 1
+            open_elements.append(elem)
+            open_names.append(name)
+            continue
 
-    bbox_min, bbox_max, positions_count = _compute_bbox(root, ns)
+        open_elements.pop()
+        open_names.pop()
+        if name == "library_visual_scenes":
+            visual_scenes_depth -= 1
+        elif name == "triangles":
+            count_attr = elem.get("count")
+            if count_attr and count_attr.isdigit():
+                triangles_count += int(count_attr)
+        elif name == "float_array":
+            array_id = elem.get("id", "")
+            raw_text = (elem.text or "").strip()
+            if "positions" in array_id.lower() and raw_text:
+                floats = _parse_floats(raw_text)
+                if floats.size:
+                    pending_positions[array_id] = floats
+        elif name == "accessor":
+            source = elem.get("source", "")
+            floats = pending_positions.pop(source[1:], None) if source.startswith("#") else None
+            if floats is not None:
+                bbox.add(floats, _parse_stride(elem.get("stride", "3")))
+
+        # Drop finished subtrees so memory stays proportional to nesting depth.
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+    for floats in pending_positions.values():
+        bbox.add(floats, 3)
 
     return DaeQcResult(
         size_bytes=size_bytes,
         geometry_count=geometry_count,
         node_count=node_count,
         triangles_count=triangles_count,
-        bbox_min=bbox_min,
-        bbox_max=bbox_max,
-        positions_count=positions_count,
+        bbox_min=bbox.bbox_min(),
+        bbox_max=bbox.bbox_max(),
+        positions_count=bbox.positions_count,
     )
 
 
@@ -69,71 +147,62 @@ def log_qc(result: DaeQcResult) -> None:
         logging.info("DAE QC: bbox unavailable (no position arrays found)")
 
 
-def _detect_namespace(tag: str) -> str | None:
-    if tag.startswith("{") and "}" in tag:
-        return tag[1 : tag.index("}")]
-    return None
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
 
 
-def _compute_bbox(root: ET.Element, ns: dict[str, str]) -> tuple[tuple[float, float, float] | None, tuple[float, float, float] | None, int]:
-    accessors = _collect_accessors(root, ns)
-    bbox_min: list[float] | None = None
-    bbox_max: list[float] | None = None
-    positions_count = 0
+def _parse_stride(text: str) -> int:
+    try:
+        return int(text)
+    except ValueError:
+        return 3
 
-    for float_array in root.findall(".//c:float_array", ns):
-        array_id = float_array.get("id", "")
-        if "positions" not in array_id.lower():
-            continue
-        raw_text = (float_array.text or "").strip()
-        if not raw_text:
-            continue
-        floats = _parse_floats(raw_text)
-        if not floats:
-            continue
-        stride = accessors.get(array_id, 3)
-        if stride < 3:
-            continue
-        for i in range(0, len(floats) - 2, stride):
-            x, y, z = floats[i], floats[i + 1], floats[i + 2]
-            positions_count += 1
-            if bbox_min is None:
-                bbox_min = [x, y, z]
-                bbox_max = [x, y, z]
-            else:
-                bbox_min[0] = min(bbox_min[0], x)
-                bbox_min[1] = min(bbox_min[1], y)
-                bbox_min[2] = min(bbox_min[2], z)
-                bbox_max[0] = max(bbox_max[0], x)
-                bbox_max[1] = max(bbox_max[1], y)
-                bbox_max[2] = max(bbox_max[2], z)
-
-    if bbox_min is None or bbox_max is None:
-        return None, None, positions_count
-    return (bbox_min[0], bbox_min[1], bbox_min[2]), (bbox_max[0], bbox_max[1], bbox_max[2]), positions_count
-
-
-def _collect_accessors(root: ET.Element, ns: dict[str, str]) -> dict[str, int]:
-    accessors: dict[str, int] = {}
-    for accessor in root.findall(".//c:accessor", ns):
-        source = accessor.get("source", "")
-        if not source.startswith("#"):
-            continue
-        source_id = source[1:]
-        stride_text = accessor.get("stride", "3")
+
+class _BboxAccumulator:
+    def __init__(self) -> None:
+        self._min: np.ndarray | None = None
+        self._max: np.ndarray | None = None
+        self.positions_count = 0
+
+    def add(self, floats: np.ndarray, stride: int) -> None:
+        count = floats.size // stride if stride >= 3 else 0
+        if count == 0:
+            return
+        points = floats[: count * stride].reshape(count, stride)[:, :3]
+        chunk_min = points.min(axis=0)
+        chunk_max = points.max(axis=0)
+        self.positions_count += count
+        if self._min is None or self._max is None:
+            self._min, self._max = chunk_min, chunk_max
+        else:
+            self._min = np.minimum(self._min, chunk_min)
+            self._max = np.maximum(self._max, chunk_max)
+
+    def bbox_min(self) -> tuple[float, float, float] | None:
+        return None if self._min is None else _as_point(self._min)
+
+    def bbox_max(self) -> tuple[float, float, float] | None:
+        return None if self._max is None else _as_point(self._max)
+
+
+def _as_point(values: np.ndarray) -> tuple[float, float, float]:
+    return float(values[0]), float(values[1]), float(values[2])
+
+
+def _parse_floats(text: str) -> np.ndarray:
+    with warnings.catch_warnings():
+        # fromstring only warns (and truncates) on malformed tokens; treat that as a failure.
+        warnings.simplefilter("error", DeprecationWarning)
         try:
-            stride = int(stride_text)
-        except ValueError:
-            stride = 3
-        accessors[source_id] = stride
-    return accessors
+            return np.fromstring(text, dtype=np.float64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            pass
+    return np.fromiter(_iter_valid_floats(text.split()), dtype=np.float64)
 
 
-def _parse_floats(text: str) -> list[float]:
-    values: list[float] = []
-    for token in text.split():
+def _iter_valid_floats(tokens: list[str]) -> Iterator[float]:
+    for token in tokens:
         try:
-            values.append(float(token))
+            yield float(token)
         except ValueError:
             continue
-    return values
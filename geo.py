@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import math
+from functools import lru_cache
 from typing import Iterable
 
 
 def ecef_to_lla_radians(ecef: Iterable[float]) -> tuple[float, float, float]:
-    x, y, z = _coerce_ecef(ecef)
+    return _ecef_to_lla_radians(*_coerce_ecef(ecef))
+
+
+@lru_cache(maxsize=128)
+def _ecef_to_lla_radians(x: float, y: float, z: float) -> tuple[float, float, float]:
     a = 6378137.0
     f = 1.0 / 298.257223563
     b = a * (1.0 - f)
@@ -35,7 +40,11 @@ def ecef_to_lla_degrees(ecef: Iterable[float]) -> tuple[float, float, float]:
 
 
 def lla_degrees_to_ecef(lla: Iterable[float]) -> tuple[float, float, float]:
-    lat_deg, lon_deg, alt = _coerce_lla(lla)
+    return _lla_degrees_to_ecef(*_coerce_lla(lla))
+
+
+@lru_cache(maxsize=128)
+def _lla_degrees_to_ecef(lat_deg: float, lon_deg: float, alt: float) -> tuple[float, float, float]:
     lat = math.radians(lat_deg)
     lon = math.radians(lon_deg)
 
@@ -2,23 +2,51 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from pathlib import Path
 from typing import Any
 
 from geo import ecef_to_lla_degrees
 
+_KML_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+  <Document>
+    <Placemark>
+      <name>Tileset Model</name>
+      <Model>
+        <altitudeMode>{altitude_mode}</altitudeMode>
+        <Location>
+          <longitude>{longitude}</longitude>
+          <latitude>{latitude}</latitude>
+          <altitude>{altitude}</altitude>
+        </Location>
+        <Orientation>
+          <heading>{heading}</heading>
+          <tilt>{tilt}</tilt>
+          <roll>{roll}</roll>
+        </Orientation>
+        <Scale>
+          <x>1</x>
+          <y>1</y>
+          <z>1</z>
+        </Scale>
+        <Link>
+          <href>{model_href}</href>
+        </Link>
+      </Model>
+    </Placemark>
+  </Document>
+</kml>
+"""
 
 @dataclass(frozen=True)
 class KmlResult:
-    output_path: Path
+    content: str
     latitude: float
     longitude: float
     altitude: float
 
 
-def write_kml(
+def build_kml(
     manifest: dict[str, Any],
-    output_path: Path,
     model_href: str = "model.dae",
     altitude_mode: str = "clampToGround",
 ) -> KmlResult:
@@ -34,22 +62,19 @@ def write_kml(
     if altitude_mode == "clampToGround":
         alt = 0.0
 
-    output_path.write_text(
-        _render_kml(
-            latitude=lat,
-            longitude=lon,
-            altitude=alt,
-            heading=heading,
-            tilt=tilt,
-            roll=roll,
-            model_href=model_href,
-            altitude_mode=altitude_mode,
-        ),
-        encoding="utf-8",
+    content = _render_kml(
+        latitude=lat,
+        longitude=lon,
+        altitude=alt,
+        heading=heading,
+        tilt=tilt,
+        roll=roll,
+        model_href=model_href,
+        altitude_mode=altitude_mode,
     )
 
     return KmlResult(
-        output_path=output_path,
+        content=content,
         latitude=lat,
         longitude=lon,
         altitude=alt,
@@ -77,36 +102,17 @@ def _render_kml(
     model_href: str,
     altitude_mode: str,
 ) -> str:
-    return (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
-        "<kml xmlns=\"http://www.opengis.net/kml/2.2\">\n"
-        "  <Document>\n"
-        "    <Placemark>\n"
-        "      <name>Tileset Model</name>\n"
-        "      <Model>\n"
-        f"        <altitudeMode>{_escape(altitude_mode)}</altitudeMode>\n"
-        "        <Location>\n"
-        f"          <longitude>{_fmt(longitude)}</longitude>\n"
-        f"          <latitude>{_fmt(latitude)}</latitude>\n"
-        f"          <altitude>{_fmt(altitude)}</altitude>\n"
-        "        </Location>\n"
-        "        <Orientation>\n"
-        f"          <heading>{_fmt(heading)}</heading>\n"
-        f"          <tilt>{_fmt(tilt)}</tilt>\n"
-        f"          <roll>{_fmt(roll)}</roll>\n"
-        "        </Orientation>\n"
-        "        <Scale>\n"
-        "          <x>1</x>\n"
-        "          <y>1</y>\n"
-        "          <z>1</z>\n"
-        "        </Scale>\n"
-        "        <Link>\n"
-        f"          <href>{_escape(model_href)}</href>\n"
-        "        </Link>\n"
-        "      </Model>\n"
-        "    </Placemark>\n"
-        "  </Document>\n"
-        "</kml>\n"
+    return _KML_TEMPLATE.format_map(
+        {
+            "altitude_mode": _escape(altitude_mode),
+            "longitude": _fmt(longitude),
+            "latitude": _fmt(latitude),
+            "altitude": _fmt(altitude),
+            "heading": _fmt(heading),
+            "tilt": _fmt(tilt),
+            "roll": _fmt(roll),
+            "model_href": _escape(model_href),
+        }
     )
 
 
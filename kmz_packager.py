@@ -1,10 +1,34 @@
 from __future__ import annotations
 
+import errno
+import io
+import os
 import shutil
 import zipfile
 from dataclasses import dataclass
 from pathlib import Path
 
+from zip_writer import ZIP32_MAX_SIZE, DeflateZipWriter
+
+try:
+    from isal import isal_zlib
+except ImportError:  # optional SIMD deflate; stdlib zipfile is the fallback
+    isal_zlib = None
+
+_DEFAULT_COMPRESS_LEVEL = 3
+# ISA-L only implements levels 0-3; higher levels go through zlib.
+_FAST_MAX_COMPRESS_LEVEL = 3
+# Already-compressed payloads are stored as-is instead of being deflated again.
+_STORED_SUFFIXES = {".glb", ".png", ".jpg", ".jpeg", ".kmz", ".zip"}
+# Large buffers cut deflate driver calls and tiny write() syscalls.
+_BUFFER_SIZE = 1024 * 1024
+# The fast writer has no ZIP64 support; keep headroom for deflate expansion and headers.
+_FAST_WRITER_MAX_SIZE = ZIP32_MAX_SIZE - (1 << 24)
+# zipfile switches a streamed entry to ZIP64 once file_size * 1.05 exceeds ZIP64_LIMIT
+# (2 GiB - 1), and raises LargeZipFile if ZIP64 is disallowed; mirror that margin.
+_ZIP64_FUDGE = 1.05
+_ZIP64_SAFE_MAX_SIZE = zipfile.ZIP64_LIMIT - (1 << 20)
+
 
 @dataclass(frozen=True)
 class PackageResult:
@@ -14,11 +38,15 @@ class PackageResult:
 
 def package_kmz(
     output_path: Path,
-    doc_kml_path: Path,
+    doc_kml: str,
     model_dae_path: Path,
+    compress_level: int = _DEFAULT_COMPRESS_LEVEL,
 ) -> PackageResult:
-    if not doc_kml_path.exists():
-        raise FileNotFoundError(f"Missing doc.kml: {doc_kml_path}")
+    """Write doc.kml and model.dae into output_path.
+
+    Entries are deflated at compress_level; names in _STORED_SUFFIXES (none of the
+    current entries, reserved for future textures) are stored uncompressed.
+    """
     if not model_dae_path.exists():
         raise FileNotFoundError(f"Missing model.dae: {model_dae_path}")
 
@@ -26,25 +54,105 @@ def package_kmz(
     temp_path = output_path.with_suffix(".kmz.tmp")
 
     fixed_time = (1980, 1, 1, 0, 0, 0)
-    entries = [("doc.kml", doc_kml_path), ("model.dae", model_dae_path)]
+    # The KML is rendered in memory, so only the DAE is read from disk.
+    kml_bytes = doc_kml.encode("utf-8")
+    entries: list[tuple[str, bytes | Path]] = [
+        ("doc.kml", kml_bytes),
+        ("model.dae", model_dae_path),
+    ]
+    total_size = len(kml_bytes) + model_dae_path.stat().st_size
 
-    with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for arcname, source in sorted(entries, key=lambda item: item[0]):
-            _write_entry(zf, arcname, source, fixed_time)
+    entries.sort(key=lambda item: item[0])
+    try:
+        _write_archive(temp_path, entries, fixed_time, compress_level, total_size)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
 
-    shutil.move(temp_path, output_path)
+    _replace_file(temp_path, output_path)
     return PackageResult(output_path=output_path, input_count=len(entries))
 
 
+def _write_archive(
+    temp_path: Path,
+    entries: list[tuple[str, bytes | Path]],
+    fixed_time: tuple[int, int, int, int, int, int],
+    compress_level: int,
+    total_size: int,
+) -> None:
+    if (
+        isal_zlib is not None
+        and compress_level <= _FAST_MAX_COMPRESS_LEVEL
+        and total_size < _FAST_WRITER_MAX_SIZE
+    ):
+        _write_fast(temp_path, entries, fixed_time, compress_level)
+    else:
+        with temp_path.open("wb", buffering=_BUFFER_SIZE) as handle, zipfile.ZipFile(
+            handle,
+            "w",
+            compression=zipfile.ZIP_DEFLATED,
+            allowZip64=total_size * _ZIP64_FUDGE > _ZIP64_SAFE_MAX_SIZE,
+        ) as zf:
+            for arcname, source in entries:
+                _write_entry(zf, arcname, source, fixed_time, compress_level)
+
+
 def _write_entry(
     zf: zipfile.ZipFile,
     arcname: str,
-    source: Path,
+    source: bytes | Path,
     fixed_time: tuple[int, int, int, int, int, int],
+    compress_level: int,
 ) -> None:
     info = zipfile.ZipInfo(arcname, date_time=fixed_time)
-    info.compress_type = zipfile.ZIP_DEFLATED
+    info.compress_type = zipfile.ZIP_STORED if _is_stored(arcname) else zipfile.ZIP_DEFLATED
     info.external_attr = 0o644 << 16
-    with source.open("rb") as handle:
-        data = handle.read()
-    zf.writestr(info, data)
+    if not isinstance(source, Path):
+        zf.writestr(info, source, compresslevel=compress_level)
+        return
+    # ZipInfo entries ignore ZipFile(compresslevel=...) and zf.open() takes no level, so it is
+    # set on the entry: public compress_level on Python 3.13+, the private slot before that.
+    if hasattr(info, "compress_level"):
+        info.compress_level = compress_level
+    else:
+        info._compresslevel = compress_level
+    # Stream from disk so a large DAE is never held in memory as one bytes object.
+    info.file_size = source.stat().st_size
+    with source.open("rb") as src, zf.open(info, "w") as dst:
+        shutil.copyfileobj(src, dst, _BUFFER_SIZE)
+
+
+def _write_fast(
+    temp_path: Path,
+    entries: list[tuple[str, bytes | Path]],
+    fixed_time: tuple[int, int, int, int, int, int],
+    compress_level: int,
+) -> None:
+    with temp_path.open("wb", buffering=_BUFFER_SIZE) as handle:
+        writer = DeflateZipWriter(
+            handle,
+            compressobj=lambda level: isal_zlib.compressobj(level, isal_zlib.DEFLATED, -15),
+            crc32=isal_zlib.crc32,
+        )
+        for arcname, source in entries:
+            compress = not _is_stored(arcname)
+            if isinstance(source, Path):
+                with source.open("rb") as src:
+                    writer.write(arcname, src, compress_level, fixed_time, compress)
+            else:
+                writer.write(arcname, io.BytesIO(source), compress_level, fixed_time, compress)
+        writer.close()
+
+
+def _replace_file(source: Path, target: Path) -> None:
+    # The temp file sits next to the output, so this is normally a single atomic rename.
+    try:
+        os.replace(source, target)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        shutil.move(source, target)
+
+
+def _is_stored(arcname: str) -> bool:
+    return Path(arcname).suffix.lower() in _STORED_SUFFIXES
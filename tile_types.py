@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+# eq=False: field-wise __eq__/__hash__ would fail on the ndarray transform, so records
+# compare and hash by identity.
+@dataclass(frozen=True, eq=False)
+class TileRecord:
+    # Explicit slots keep per-tile memory low and still work on Python 3.9.
+    __slots__ = ("tile_id", "b3dm_path", "glb_path", "transform_ecef")
+
+    tile_id: str
+    b3dm_path: Path
+    glb_path: Path
+    # Column-major 4x4 as a flat float64 array of 16 values.
+    transform_ecef: np.ndarray
+
+
+def column_major_to_matrices(transforms: Any) -> np.ndarray:
+    # Rows of a (N, 16) column-major array are transposed (N, 4, 4) matrices; this is a view.
+    return np.asarray(transforms, dtype=np.float64).reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
+def matrices_to_column_major(matrices: Any) -> np.ndarray:
+    # Inverse of column_major_to_matrices, as one contiguous (N, 16) copy.
+    if len(matrices) == 0:
+        return np.empty((0, 16), dtype=np.float64)
+    return np.asarray(matrices, dtype=np.float64).transpose(0, 2, 1).reshape(-1, 16)
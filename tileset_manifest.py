@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-import json
-import math
+import os
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterable
 
 import numpy as np
 
-from geo import ecef_to_lla_degrees, lla_degrees_to_ecef
+from bounding_volume import derive_origin, tile_centers_ecef
+from json_io import dumps_json, load_json_file
+from tile_types import TileRecord, column_major_to_matrices, matrices_to_column_major
+
+# Shared, read-only seed and "no transform" matrix; the walker never writes into matrices.
+_IDENTITY_4 = np.identity(4, dtype=np.float64)
+_IDENTITY_4.flags.writeable = False
+
 
 @dataclass(frozen=True)
 class ManifestResult:
@@ -16,6 +23,7 @@ class ManifestResult:
     manifest_path: Path
     tile_count: int
     root_ecef: list[float]
+    tiles: list[TileRecord]
 
 
 def build_manifest(
@@ -28,46 +36,69 @@ def build_manifest(
     glb_dir = cache_dir / "glb"
     glb_dir.mkdir(parents=True, exist_ok=True)
 
-    tiles: list[dict[str, Any]] = []
+    # Columns per kept tile; rows are only assembled once the walk is done.
+    tile_ids: list[str] = []
+    b3dm_paths: list[Path] = []
+    matrices: list[np.ndarray] = []
+    bounding_volumes: list[Any] = []
     root_tile = tileset.get("root")
     if not isinstance(root_tile, dict):
         raise ValueError("tileset.json missing root tile")
 
     root_full = None
     walker = _TileWalker()
-    for tile_id, tile, full_transform, tile_base_dir in walker.walk_tileset(
+    for tile_index, tile, full_transform, tile_base_dir in walker.walk_tileset(
         root_tile,
         tileset_dir,
-        np.identity(4, dtype=float),
+        _IDENTITY_4,
     ):
         if root_full is None:
             root_full = full_transform
         if not _is_leaf_tile(tile):
             continue
-        for uri in _extract_content_uris(tile):
-            if _is_tileset_uri(uri):
-                external_path = _resolve_content_path(tile_base_dir, uri)
+        tile_id = f"tile_{tile_index:06d}"
+        for content_path, lowered in _extract_content_paths(tile):
+            if lowered.endswith(".json"):
+                external_path = walker.resolve_content_path(tile_base_dir, content_path)
                 walker.queue_external_tileset(external_path, full_transform)
                 continue
-            if not _is_b3dm_uri(uri):
+            if not lowered.endswith(".b3dm"):
                 continue
-            b3dm_path = _resolve_content_path(tile_base_dir, uri)
-            if not b3dm_path.exists():
+            b3dm_path = walker.resolve_content_path(tile_base_dir, content_path)
+            if not walker.content_exists(b3dm_path):
                 raise ValueError(f"Missing b3dm content: {b3dm_path}")
-            tiles.append(
-                {
-                    "tile_id": tile_id,
-                    "b3dm_path": str(b3dm_path),
-                    "glb_path": str(glb_dir / f"{tile_id}.glb"),
-                    "transform_ecef": _matrix_to_column_major(full_transform),
-                    "boundingVolume": tile.get("boundingVolume"),
-                }
-            )
+            tile_ids.append(tile_id)
+            b3dm_paths.append(b3dm_path)
+            matrices.append(full_transform)
+            bounding_volumes.append(tile.get("boundingVolume"))
 
     if root_full is None:
         raise ValueError("No tiles found in tileset.json")
 
-    origin_ecef, origin_lla, origin_strategy = _derive_origin(root_tile, root_full)
+    transforms = _tile_transforms(matrices)
+    centers = tile_centers_ecef(bounding_volumes, transforms)
+    records = [
+        TileRecord(
+            tile_id=tile_id,
+            b3dm_path=b3dm_path,
+            glb_path=glb_dir / f"{tile_id}.glb",
+            transform_ecef=transform,
+        )
+        for tile_id, b3dm_path, transform in zip(tile_ids, b3dm_paths, transforms)
+    ]
+    tiles = [
+        {
+            "tile_id": record.tile_id,
+            "b3dm_path": str(record.b3dm_path),
+            "glb_path": str(record.glb_path),
+            "transform_ecef": record.transform_ecef,
+            "boundingVolume": bounding_volume,
+            "center_ecef": center_ecef,
+        }
+        for record, bounding_volume, center_ecef in zip(records, bounding_volumes, centers)
+    ]
+
+    origin_ecef, origin_lla, origin_strategy = derive_origin(root_tile, root_full)
     manifest = {
         "tiles": tiles,
         "origin": {
@@ -83,13 +114,14 @@ def build_manifest(
         manifest_path=manifest_path,
         tile_count=len(tiles),
         root_ecef=origin_ecef,
+        tiles=records,
     )
 
 
 def _load_tileset(path: Path) -> dict[str, Any]:
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
+        data = load_json_file(path)
+    except ValueError as exc:
         raise ValueError(f"Invalid tileset.json: {exc}") from exc
     if not isinstance(data, dict):
         raise ValueError("tileset.json must contain a JSON object")
@@ -101,113 +133,100 @@ class _TileWalker:
         self._counter = 0
         self._queued_tilesets: list[tuple[Path, np.ndarray]] = []
         self._visited_tilesets: set[Path] = set()
+        self._resolved_bases: dict[Path, str] = {}
+        self._dir_listings: dict[str, set[str]] = {}
 
     def walk_tileset(
         self,
         root: dict[str, Any],
         base_dir: Path,
         parent_transform: np.ndarray,
-    ) -> Iterable[tuple[str, dict[str, Any], np.ndarray, Path]]:
-        stack: list[tuple[str, dict[str, Any], np.ndarray, Path]] = [
-            ("tile_000000", root, parent_transform, base_dir)
-        ]
+    ) -> Iterable[tuple[int, dict[str, Any], np.ndarray, Path]]:
+        # Tiles carry integer indices; ids are formatted only for leaves that are kept.
+        stack: deque[tuple[int, dict[str, Any], np.ndarray, Path]] = deque(
+            [(0, root, parent_transform, base_dir)]
+        )
         while stack:
-            tile_id, tile, parent_transform, tile_base_dir = stack.pop()
-            local_transform = _matrix_from_tile(tile.get("transform"))
-            full_transform = parent_transform @ local_transform
-            yield tile_id, tile, full_transform, tile_base_dir
-            children = tile.get("children") or []
+            tile_index, tile, parent_transform, tile_base_dir = stack.pop()
+            transform = tile.get("transform")
+            # Most tiles carry no transform; reuse the parent matrix instead of a 4x4 matmul.
+            if transform:
+                full_transform = parent_transform @ _matrix_from_tile(transform)
+            else:
+                full_transform = parent_transform
+            yield tile_index, tile, full_transform, tile_base_dir
+            children = tile.get("children")
             if isinstance(children, list):
                 for child in reversed(children):
                     if isinstance(child, dict):
                         self._counter += 1
-                        stack.append(
-                            (
-                                f"tile_{self._counter:06d}",
-                                child,
-                                full_transform,
-                                tile_base_dir,
-                            )
-                        )
+                        stack.append((self._counter, child, full_transform, tile_base_dir))
             while self._queued_tilesets:
                 tileset_path, tileset_parent_transform = self._queued_tilesets.pop()
-                if tileset_path in self._visited_tilesets:
-                    continue
-                self._visited_tilesets.add(tileset_path)
                 external_tileset = _load_tileset(tileset_path)
                 external_root = external_tileset.get("root")
                 if not isinstance(external_root, dict):
                     raise ValueError(f"External tileset missing root tile: {tileset_path}")
                 external_dir = tileset_path.parent
                 self._counter += 1
-                stack.append(
-                    (
-                        f"tile_{self._counter:06d}",
-                        external_root,
-                        tileset_parent_transform,
-                        external_dir,
-                    )
-                )
+                stack.append((self._counter, external_root, tileset_parent_transform, external_dir))
+
+    def resolve_content_path(self, base_dir: Path, content_path: str) -> Path:
+        # Resolve (and stat) each base directory once; content paths are joined lexically.
+        resolved_base = self._resolved_bases.get(base_dir)
+        if resolved_base is None:
+            resolved_base = str(base_dir.expanduser().resolve())
+            self._resolved_bases[base_dir] = resolved_base
+        return Path(os.path.normpath(os.path.join(resolved_base, content_path)))
+
+    def content_exists(self, path: Path) -> bool:
+        # One scandir per content directory instead of a stat per tile. A miss is rechecked
+        # with a real stat, e.g. for case-insensitive filesystems.
+        directory = str(path.parent)
+        listing = self._dir_listings.get(directory)
+        if listing is None:
+            listing = self._dir_listings[directory] = _list_files(directory)
+        return path.name in listing or path.is_file()
 
     def queue_external_tileset(self, tileset_path: Path, parent_transform: np.ndarray) -> None:
         if tileset_path.suffix.lower() != ".json":
             return
-        self._queued_tilesets.append((tileset_path, parent_transform))
+        # Dedupe on the real path when queued, so each external tileset is loaded once
+        # however many tiles (or symlinked directories) reference it.
+        resolved = tileset_path.resolve()
+        if resolved in self._visited_tilesets:
+            return
+        self._visited_tilesets.add(resolved)
+        self._queued_tilesets.append((resolved, parent_transform))
+
+
+def _list_files(directory: str) -> set[str]:
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        return set()
 
 
 def _matrix_from_tile(transform: Any) -> np.ndarray:
     if not transform:
-        return np.identity(4, dtype=float)
+        return _IDENTITY_4
     if isinstance(transform, list) and len(transform) == 16:
-        return np.array(transform, dtype=float).reshape((4, 4), order="F")
+        # Column-major input: the transposed view of the reshape, not a copy.
+        return column_major_to_matrices(transform)[0]
     raise ValueError("Tile transform must be a 16-number array")
 
 
-def _matrix_to_column_major(matrix: np.ndarray) -> list[float]:
-    return [float(value) for value in matrix.reshape(16, order="F")]
-
-
-def _extract_translation(matrix: np.ndarray) -> list[float]:
-    translation = matrix[:3, 3]
-    return [float(value) for value in translation]
-
-
-def _derive_origin(
-    root_tile: dict[str, Any],
-    root_full: np.ndarray,
-) -> tuple[list[float], list[float], str]:
-    bounding_volume = root_tile.get("boundingVolume")
-    if isinstance(bounding_volume, dict):
-        region = bounding_volume.get("region")
-        if isinstance(region, list) and len(region) == 6:
-            west, south, east, north, min_h, max_h = [float(v) for v in region]
-            lat = math.degrees((south + north) * 0.5)
-            lon = math.degrees((west + east) * 0.5)
-            alt = min_h
-            origin_lla = [lat, lon, alt]
-            origin_ecef = list(lla_degrees_to_ecef(origin_lla))
-            return origin_ecef, origin_lla, "region"
-        sphere = bounding_volume.get("sphere")
-        if isinstance(sphere, list) and len(sphere) == 4:
-            center = np.array([float(sphere[0]), float(sphere[1]), float(sphere[2]), 1.0])
-            ecef_center = root_full @ center
-            origin_ecef = [float(ecef_center[0]), float(ecef_center[1]), float(ecef_center[2])]
-            origin_lla = list(ecef_to_lla_degrees(origin_ecef))
-            return origin_ecef, origin_lla, "sphere"
-        box = bounding_volume.get("box")
-        if isinstance(box, list) and len(box) == 12:
-            center = np.array([float(box[0]), float(box[1]), float(box[2]), 1.0])
-            ecef_center = root_full @ center
-            origin_ecef = [float(ecef_center[0]), float(ecef_center[1]), float(ecef_center[2])]
-            origin_lla = list(ecef_to_lla_degrees(origin_ecef))
-            return origin_ecef, origin_lla, "box"
-
-    origin_ecef = _extract_translation(root_full)
-    origin_lla = list(ecef_to_lla_degrees(origin_ecef))
-    return origin_ecef, origin_lla, "root"
-
-
-def _extract_content_uris(tile: dict[str, Any]) -> list[str]:
+def _tile_transforms(matrices: list[np.ndarray]) -> np.ndarray:
+    # One (N, 16) copy for all tiles; each row is a flat column-major 4x4 the JSON
+    # writer serializes without building Python floats. Rows are shared, so read-only.
+    transforms = matrices_to_column_major(matrices)
+    transforms.flags.writeable = False
+    return transforms
+
+
+def _extract_content_paths(tile: dict[str, Any]) -> list[tuple[str, str]]:
+    # Each URI is stripped once; the lowercase copy is only used for type checks.
     uris: list[str] = []
     content = tile.get("content")
     if isinstance(content, dict):
@@ -222,7 +241,11 @@ def _extract_content_uris(tile: dict[str, Any]) -> list[str]:
             uri = entry.get("uri") or entry.get("url")
             if isinstance(uri, str):
                 uris.append(uri)
-    return uris
+    paths: list[tuple[str, str]] = []
+    for uri in uris:
+        path = _strip_query_fragment(uri)
+        paths.append((path, path.lower()))
+    return paths
 
 
 def _is_leaf_tile(tile: dict[str, Any]) -> bool:
@@ -234,25 +257,9 @@ def _is_leaf_tile(tile: dict[str, Any]) -> bool:
     return False
 
 
-def _is_b3dm_uri(uri: str) -> bool:
-    normalized = _strip_query_fragment(uri).lower()
-    return normalized.endswith(".b3dm")
-
-
-def _is_tileset_uri(uri: str) -> bool:
-    normalized = _strip_query_fragment(uri).lower()
-    return normalized.endswith("tileset.json") or normalized.endswith(".json")
-
-
-def _resolve_content_path(base_dir: Path, uri: str) -> Path:
-    normalized = _strip_query_fragment(uri)
-    return (base_dir / normalized).expanduser().resolve()
-
-
 def _strip_query_fragment(uri: str) -> str:
-    stripped = uri.split("?", 1)[0]
-    return stripped.split("#", 1)[0]
+    return uri.partition("?")[0].partition("#")[0]
 
 
 def _write_json(path: Path, payload: dict[str, Any]) -> None:
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    path.write_bytes(dumps_json(payload))
@@ -0,0 +1,58 @@
+// Long-running b3dm -> glb converter used by b3dm_to_glb.py.
+// Reads one JSON job per stdin line ({"id", "input", "output"}) and writes one
+// JSON result per stdout line ({"id", "ok", "error"}), prefixed with RESULT_TAG
+// because library loggers may also write to stdout. Exits with code 2 when
+// the 3d-tiles-tools library cannot be loaded so the caller can fall back to npx.
+import { execSync } from "node:child_process";
+import { createRequire } from "node:module";
+import path from "node:path";
+import readline from "node:readline";
+
+const UNAVAILABLE_EXIT_CODE = 2;
+const RESULT_TAG = "@@b3dm_worker ";
+
+function loadToolsMain() {
+  const require = createRequire(import.meta.url);
+  try {
+    return require("3d-tiles-tools").ToolsMain;
+  } catch {
+    // install_deps.sh installs the tools globally, which ESM/require do not search.
+    const globalRoot = execSync("npm root -g", { encoding: "utf8" }).trim();
+    return require(path.join(globalRoot, "3d-tiles-tools")).ToolsMain;
+  }
+}
+
+function writeResult(result) {
+  process.stdout.write(`${RESULT_TAG}${JSON.stringify(result)}\n`);
+}
+
+// Route console output away from stdout; loggers that write to fd 1 directly are
+// filtered out on the Python side by RESULT_TAG.
+console.log = (...args) => console.error(...args);
+console.info = (...args) => console.error(...args);
+
+let toolsMain;
+try {
+  toolsMain = loadToolsMain();
+} catch (error) {
+  console.error(`Unable to load 3d-tiles-tools: ${error?.message ?? error}`);
+  process.exit(UNAVAILABLE_EXIT_CODE);
+}
+if (!toolsMain || typeof toolsMain.b3dmToGlb !== "function") {
+  console.error("3d-tiles-tools does not expose ToolsMain.b3dmToGlb");
+  process.exit(UNAVAILABLE_EXIT_CODE);
+}
+
+const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+for await (const line of lines) {
+  if (!line.trim()) {
+    continue;
+  }
+  const job = JSON.parse(line);
+  try {
+    await toolsMain.b3dmToGlb(job.input, job.output, true);
+    writeResult({ id: job.id, ok: true });
+  } catch (error) {
+    writeResult({ id: job.id, ok: false, error: String(error?.message ?? error) });
+  }
+}
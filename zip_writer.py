@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import struct
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_DATA_DESCRIPTOR = struct.Struct("<4sIII")
+_CENTRAL_HEADER = struct.Struct("<4sHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<4sHHHHIIH")
+
+_VERSION_NEEDED = 20
+_VERSION_MADE_BY = (3 << 8) | _VERSION_NEEDED  # UNIX host, like zipfile on POSIX
+_FLAG_DATA_DESCRIPTOR = 0x08
+_METHOD_STORED = 0
+_METHOD_DEFLATED = 8
+_EXTERNAL_ATTR = 0o644 << 16
+_CHUNK_SIZE = 1024 * 1024
+# Sizes and offsets are 32-bit fields without ZIP64 extensions.
+ZIP32_MAX_SIZE = 0xFFFFFFFF
+
+
+class DeflateZipWriter:
+    """Minimal streaming ZIP writer with a pluggable raw DEFLATE backend.
+
+    Sizes and CRC follow each entry in a data descriptor, so sources are read
+    once in chunks. No ZIP64 support: callers must keep every entry size and the
+    whole archive at or below ZIP32_MAX_SIZE (4 GiB - 1).
+    """
+
+    def __init__(
+        self,
+        handle: BinaryIO,
+        compressobj: Callable[[int], Any],
+        crc32: Callable[[bytes, int], int],
+    ) -> None:
+        self._handle = handle
+        self._compressobj = compressobj
+        self._crc32 = crc32
+        self._offset = 0
+        self._central: list[bytes] = []
+
+    def write(
+        self,
+        arcname: str,
+        source: BinaryIO,
+        level: int,
+        date_time: tuple[int, int, int, int, int, int],
+        compress: bool = True,
+    ) -> None:
+        name = arcname.encode("utf-8")
+        method = _METHOD_DEFLATED if compress else _METHOD_STORED
+        dos_time, dos_date = _dos_date_time(date_time)
+        header_offset = self._offset
+        self._emit(
+            _LOCAL_HEADER.pack(
+                b"PK\x03\x04",
+                _VERSION_NEEDED,
+                _FLAG_DATA_DESCRIPTOR,
+                method,
+                dos_time,
+                dos_date,
+                0,
+                0,
+                0,
+                len(name),
+                0,
+            )
+            + name
+        )
+
+        if compress:
+            crc, file_size, compress_size = self._copy_deflated(source, level)
+        else:
+            crc, file_size, compress_size = self._copy_stored(source)
+        self._emit(_DATA_DESCRIPTOR.pack(b"PK\x07\x08", crc, compress_size, file_size))
+
+        self._central.append(
+            _CENTRAL_HEADER.pack(
+                b"PK\x01\x02",
+                _VERSION_MADE_BY,
+                _VERSION_NEEDED,
+                _FLAG_DATA_DESCRIPTOR,
+                method,
+                dos_time,
+                dos_date,
+                crc,
+                compress_size,
+                file_size,
+                len(name),
+                0,
+                0,
+                0,
+                0,
+                _EXTERNAL_ATTR,
+                header_offset,
+            )
+            + name
+        )
+
+    def _copy_stored(self, source: BinaryIO) -> tuple[int, int, int]:
+        crc = 0
+        file_size = 0
+        for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+            crc = self._crc32(chunk, crc)
+            file_size += self._emit(chunk)
+        return crc, file_size, file_size
+
+    def _copy_deflated(self, source: BinaryIO, level: int) -> tuple[int, int, int]:
+        # Deflate runs one chunk ahead on a worker thread (the backends release the GIL)
+        # while this thread reads, checksums and writes; one worker keeps chunks in order.
+        compressor = self._compressobj(level)
+        crc = 0
+        file_size = 0
+        compress_size = 0
+        pending: Future[bytes] | None = None
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+                submitted = pool.submit(compressor.compress, chunk)
+                crc = self._crc32(chunk, crc)
+                file_size += len(chunk)
+                if pending is not None:
+                    compress_size += self._emit(pending.result())
+                pending = submitted
+            if pending is not None:
+                compress_size += self._emit(pending.result())
+        compress_size += self._emit(compressor.flush())
+        return crc, file_size, compress_size
+
+    def close(self) -> None:
+        directory_offset = self._offset
+        directory_size = sum(self._emit(record) for record in self._central)
+        count = len(self._central)
+        self._emit(
+            _END_RECORD.pack(b"PK\x05\x06", 0, 0, count, count, directory_size, directory_offset, 0)
+        )
+
+    def _emit(self, data: bytes) -> int:
+        self._handle.write(data)
+        self._offset += len(data)
+        return len(data)
+
+
+def _dos_date_time(date_time: tuple[int, int, int, int, int, int]) -> tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    dos_date = ((year - 1980) << 9) | (month << 5) | day
+    dos_time = (hour << 11) | (minute << 5) | (second // 2)
+    return dos_time, dos_date